@@ -1,161 +1,170 @@
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Optional
+import concurrent.futures
+import itertools
 import json
+import os
 import numpy as np
 import pandas as pd
 import yaml
-from cafa_metrics import get_rumi
 
+try:
+    # orjson parses the large numeric/string-heavy prediction files several
+    # times faster than the stdlib json module:
+    import orjson
+except ImportError:
+    orjson = None
 
-def initialize_proteins_and_thresholds_dataframe(
-    proteins: Iterable, thresholds: Iterable
-) -> pd.DataFrame:
-    """Creates a pandas.DataFrame that will have one row per protein/threshold pair.
-    # It will only include the thresholds that actually exist in the prediction data and not a
-    # complete range of possible thresholds:
-    :param proteins:
-    :param thresholds:
-    :return:
-    """
-    columns = (
-        "protein",
-        "threshold",
-        "tp_ia",
-        "fp_ia",
-        "fn_ia",
-        "benchmark_ia",
-        "ru",
-        "mi",
-        "weighted_precision",
-        "weighted_recall",
-        "tp",
-        "fp",
-        "fn",
-        "tn",
-        "precision",
-        "recall",
-    )
+try:
+    # numba, when available, compiles the per-protein threshold sweep to
+    # native code (see _threshold_sweep below):
+    import numba
+except ImportError:
+    numba = None
 
-    matrix = np.zeros(((len(proteins) * len(thresholds)), len(columns)))
-    protein_and_threshold_df = pd.DataFrame(
-        data=matrix,
-        columns=columns
-    )
-    df_datatypes = {
-        "protein": "str",
-        "threshold": "float",
-        "tp_ia": "float",
-        "fp_ia": "float",
-        "fn_ia": "float",
-        "benchmark_ia": "float",
-        "ru": "float",
-        "mi": "float",
-        "weighted_precision": "float",
-        "weighted_recall": "float",
-        "tp": "float",
-        "fp": "float",
-        "fn": "float",
-        "tn": "float",
-        "precision": "float",
-        "recall": "float",
-    }
-    protein_and_threshold_df = protein_and_threshold_df.astype(df_datatypes)
+try:
+    # ijson allows incremental parsing of prediction files too large to
+    # comfortably materialize through a whole-file parser:
+    import ijson
+except ImportError:
+    ijson = None
 
-    # The DataFrame is empty. Next, populate the protein and threshold columns:
-    benchmark_protein_index = -1
+# Prediction files larger than this are stream-parsed one protein at a time
+# to bound peak memory; smaller files go through the faster whole-file
+# parsers:
+STREAM_PARSE_THRESHOLD_BYTES = 256 * 1024 * 1024
 
-    for i in range(0, protein_and_threshold_df.shape[0]):
-        threshold_index = i % len(thresholds)
 
-        if threshold_index == 0:
-            # for every complete loop of the threshold range,
-            # increment the protein index:
-            benchmark_protein_index += 1
+def _load_json(filepath: Path) -> dict:
+    if orjson is not None:
+        return orjson.loads(filepath.read_bytes())
 
-        protein_and_threshold_df.iloc[i, 0] = proteins[benchmark_protein_index]
-        protein_and_threshold_df.iloc[i, 1] = thresholds[threshold_index]
+    with open(filepath, "r") as handle:
+        return json.load(handle)
 
-    protein_and_threshold_df.set_index(
-        ["protein", "threshold"], drop=True, inplace=True
-    )
-
-    """ At this point, protein_and_threshold_df has this form:
-    +------------------------+------+------+------+------+
-    |                        |   tp |   fp |   fn |   tn |
-    +========================+======+======+======+======+
-    | ('T72270000115', 0.01) |    0 |    0 |    0 |    0 |
-    +------------------------+------+------+------+------+
-    | ('T72270000115', 0.02) |    0 |    0 |    0 |    0 |
-    +------------------------+------+------+------+------+
-    | ('T72270000115', 0.03) |    0 |    0 |    0 |    0 |
-    +------------------------+------+------+------+------+
-    | ('T72270000115', 0.05) |    0 |    0 |    0 |    0 |
-    +------------------------+------+------+------+------+
-    """
-    return protein_and_threshold_df
 
+def _load_prediction_json(filepath: Path) -> dict:
+    """Loads a prediction json file mapping proteins to {term: score} dicts.
 
-def get_confusion_matrix_terms(predicted_terms: set, benchmark_terms: set) -> dict:
-    """For two given sets of terms, compute and return:
-    * terms for the true positive set
-    * terms for the false positive set
-    * terms for the false_negative set
+    Very large files are parsed incrementally with ijson, so peak memory is
+    the final dict rather than the parser's full intermediate representation
+    of the file.
     """
-    true_positive_terms = predicted_terms & benchmark_terms
-    false_positive_terms = predicted_terms - benchmark_terms
-    false_negative_terms = benchmark_terms - predicted_terms
-
-    return {
-        "TP": true_positive_terms,
-        "FP": false_positive_terms,
-        "FN": false_negative_terms,
-    }
-
-
-def calculate_weighted_confusion_matrix(
-    predicted_terms: set, benchmark_terms: set, ia_df: pd.DataFrame
-) -> dict:
-    """Calculates the weighted precision and recall for two sets of terms
-    Weighted precision and recall rely on the information content (IC) of relevant terms (nodes).
-    Here we retrieve the IC for the relevant nodes from the node_weights_df.
-
-    In practice, this will be called for the predicted_terms @ a specific threshold.
+    if (
+        ijson is not None
+        and filepath.stat().st_size > STREAM_PARSE_THRESHOLD_BYTES
+    ):
+        predictions = {}
+        with open(filepath, "rb") as prediction_handle:
+            for protein, term_scores in ijson.kvitems(
+                prediction_handle, "", use_float=True
+            ):
+                predictions[protein] = term_scores
+        return predictions
+
+    return _load_json(filepath)
+
+
+def _threshold_sweep(scores_sorted, in_benchmark, thresholds):
+    """Counts the accepted predictions and true positives at every threshold
+    for a single protein.
+
+    scores_sorted must be sorted descending with in_benchmark aligned to it,
+    and thresholds must be sorted ascending. Returns a pair of int32 arrays
+    (accepted, true_positives) with one entry per threshold.
     """
-    cm_terms = get_confusion_matrix_terms(predicted_terms, benchmark_terms)
+    if scores_sorted.shape[0] == 0:
+        zeros = np.zeros(thresholds.shape[0], dtype=np.int32)
+        return zeros, zeros.copy()
 
-    ia_go_terms = ia_df.index
+    cumulative_tp = np.cumsum(in_benchmark, dtype=np.int32)
+    accepted = np.searchsorted(-scores_sorted, -thresholds, side="right").astype(
+        np.int32
+    )
+    true_positives = np.where(accepted > 0, cumulative_tp[accepted - 1], 0).astype(
+        np.int32
+    )
+    return accepted, true_positives
+
+
+def _threshold_sweep_scalar(scores_sorted, in_benchmark, thresholds):
+    """Scalar-loop equivalent of _threshold_sweep, written for numba: walking
+    the thresholds from the highest down, the accepted predictions form a
+    growing prefix of the descending score order."""
+    threshold_count = thresholds.shape[0]
+    prediction_count = scores_sorted.shape[0]
+    accepted = np.zeros(threshold_count, dtype=np.int32)
+    true_positives = np.zeros(threshold_count, dtype=np.int32)
+
+    prefix_length = 0
+    true_positive_count = 0
+    for threshold_index in range(threshold_count - 1, -1, -1):
+        threshold = thresholds[threshold_index]
+        while (
+            prefix_length < prediction_count
+            and scores_sorted[prefix_length] >= threshold
+        ):
+            if in_benchmark[prefix_length]:
+                true_positive_count += 1
+            prefix_length += 1
+        accepted[threshold_index] = prefix_length
+        true_positives[threshold_index] = true_positive_count
+    return accepted, true_positives
 
-    # Although there should not be a case where a predicted term is not found in the ia_df because they
-    # have both been generated based on the same obo file, we can double-check that here rather than blindly
-    # selecting (.loc[...). This was added, perhaps temporarily, on 20210928 by szarecor
-    tp_info_accretion = sum([0 if term not in ia_go_terms else ia_df.loc[term, "ia"] for term in cm_terms.get("TP", [])])
-    fp_info_accretion = sum([0 if term not in ia_go_terms else ia_df.loc[term, "ia"] for term in cm_terms.get("FP", [])])
-    fn_info_accretion = sum([0 if term not in ia_go_terms else ia_df.loc[term, "ia"] for term in cm_terms.get("FN", [])])
 
-    # Adding a filter to exclude terms NOT of the same ontological namespace,
-    # I am not sure why this is necessary at this point in the process:
-    benchmark_terms_filtered = benchmark_terms.intersection(ia_df.index)
-    benchmark_info_accretion = ia_df.loc[benchmark_terms_filtered, "ia"].sum()
+if numba is not None:
+    _threshold_sweep = numba.njit(cache=True)(_threshold_sweep_scalar)
 
-    try:
-        weighted_precision = tp_info_accretion / (tp_info_accretion + fp_info_accretion)
-    except ZeroDivisionError:
-        weighted_precision = 0
 
-    weighted_recall = tp_info_accretion / benchmark_info_accretion
+def _sweep_protein(predicted_terms, benchmark_bitset, ia_values, thresholds):
+    """Computes one protein's confusion counts and IA prefix sums at every
+    threshold.
 
-    ru, mi = get_rumi(predicted_terms, benchmark_terms_filtered, ia_df)
+    predicted_terms maps interned term IDs to scores, benchmark_bitset is the
+    protein's packed benchmark membership row and ia_values the per-term-ID
+    information accretion weights. Returns an (accepted, true_positives,
+    tp_ia, predicted_ia) tuple of per-threshold arrays, or None when the
+    protein has no predictions at all. Proteins are independent, so this is
+    safe to run in worker processes.
+    """
+    if not predicted_terms:
+        return None
 
-    return {
-        "TP": tp_info_accretion,
-        "FP": fp_info_accretion,
-        "FN": fn_info_accretion,
-        "benchmark_ia": benchmark_info_accretion,
-        "weighted_precision": weighted_precision,
-        "weighted_recall": weighted_recall,
-        "ru": ru,
-        "mi": mi,
-    }
+    term_ids = np.fromiter(
+        predicted_terms.keys(), dtype=np.int32, count=len(predicted_terms)
+    )
+    scores = np.fromiter(
+        predicted_terms.values(), dtype=np.float64, count=len(predicted_terms)
+    )
+    order = np.argsort(-scores)
+    scores_sorted = scores[order]
+    term_ids_sorted = term_ids[order]
+
+    # Vectorized bitset membership test against the packed benchmark
+    # annotations:
+    unsigned_ids = term_ids_sorted.astype(np.uint64)
+    in_benchmark = (
+        (benchmark_bitset[unsigned_ids >> np.uint64(6)])
+        >> (unsigned_ids & np.uint64(63))
+        & np.uint64(1)
+    ).astype(np.uint8)
+
+    accepted, true_positives = _threshold_sweep(
+        scores_sorted, in_benchmark, thresholds
+    )
+
+    # The accepted predictions at each threshold are a prefix of the
+    # descending score order, so the IA sums over the predicted set (and its
+    # benchmark overlap) at every threshold are prefix sums too:
+    information_sorted = ia_values[term_ids_sorted]
+    cumulative_predicted_ia = np.cumsum(information_sorted)
+    cumulative_tp_ia = np.cumsum(information_sorted * in_benchmark)
+    has_accepted = accepted > 0
+    tp_ia = np.where(has_accepted, cumulative_tp_ia[accepted - 1], 0.0)
+    predicted_ia = np.where(
+        has_accepted, cumulative_predicted_ia[accepted - 1], 0.0
+    )
+    return accepted, true_positives, tp_ia, predicted_ia
 
 
 def calculate_confusion_matrix(predicted_terms: set, benchmark_terms: set) -> dict:
@@ -164,10 +173,11 @@ def calculate_confusion_matrix(predicted_terms: set, benchmark_terms: set) -> di
 
     In practice, this will be called for the predicted_terms @ a specific threshold.
     """
-    cm_terms = get_confusion_matrix_terms(predicted_terms, benchmark_terms)
-    true_positive = len(cm_terms["TP"])
-    false_positive = len(cm_terms["FP"])
-    false_negative = len(cm_terms["FN"])
+    # Only the counts are needed, so one intersection plus length arithmetic
+    # suffices - no difference sets are materialized:
+    true_positive = len(predicted_terms & benchmark_terms)
+    false_positive = len(predicted_terms) - true_positive
+    false_negative = len(benchmark_terms) - true_positive
     try:
         precision = true_positive / (true_positive + false_positive)
     except ZeroDivisionError:
@@ -182,13 +192,25 @@ def calculate_confusion_matrix(predicted_terms: set, benchmark_terms: set) -> di
     }
 
 
-def get_confusion_matrix_dataframe(
-    prediction_dict: dict, benchmark_dict: dict, ia_df: pd.DataFrame
-) -> pd.DataFrame:
-    """Constructs a pandas.DataFrame with a row for each protein/threshold pair.
+def get_confusion_matrix_records(
+    prediction_dict: dict,
+    benchmark_dict: dict,
+    ia_df: pd.DataFrame,
+    max_workers: Optional[int] = None,
+) -> np.ndarray:
+    """Computes all evaluation metrics and returns them as a NumPy structured
+    array with one record per protein/threshold pair (fields: protein,
+    threshold, the IA-weighted metrics and the confusion-matrix counts).
     The proteins are sourced from the benchmark_dict and the thresholds are sourced
     from the prediction dict.
 
+    The columnar records are the primary artifact; get_confusion_matrix_dataframe
+    wraps them in a pandas.DataFrame for callers that want one.
+
+    max_workers controls the per-protein sweep: None or 1 runs it serially in
+    this process, any other value fans it out over a process pool with that
+    many workers (values below 1 mean one worker per CPU core).
+
     The prediction_dict maps proteins to terms and threshold values and should have this form:
     {
         "T72270000115": {
@@ -212,16 +234,16 @@ def get_confusion_matrix_dataframe(
 
     """
 
-    # Get all threshold values from the nested dictionaries in the prediction data:
-    distinct_prediction_thresholds = sorted(
-        list(
-            {
-                threshold
-                for protein in prediction_dict.values()
-                for threshold in protein.values()
-            }
-        )
+    # Get all threshold values from the nested dictionaries in the prediction
+    # data. np.unique sorts and dedupes the concatenated scores at the C level
+    # rather than hashing every score through a Python set:
+    all_prediction_scores = np.fromiter(
+        itertools.chain.from_iterable(
+            protein.values() for protein in prediction_dict.values()
+        ),
+        dtype=np.float64,
     )
+    distinct_prediction_thresholds = np.unique(all_prediction_scores)
 
     # the benchmark json data should include this metadata:
     benchmark_ontology = benchmark_dict.get("benchmark_ontology")
@@ -231,74 +253,268 @@ def get_confusion_matrix_dataframe(
     benchmark_annotations = benchmark_dict.get("protein_annotations")
     benchmark_proteins = list(benchmark_annotations.keys())
 
-    # Next, create a pandas.DataFrame that will have one row per protein/threshold pair.
-    # It will only include the thresholds that actually exist in the prediction data and not a
-    # complete range of possible thresholds:
+    # Rather than re-filtering every protein's predictions at every threshold
+    # (O(proteins x thresholds x terms)), sort each protein's predicted terms
+    # by descending score once. As the threshold decreases the accepted
+    # predictions form a growing prefix of that order, so the true/false
+    # positive counts at every threshold come from a cumulative sum over the
+    # prefix plus one vectorized searchsorted against the sorted thresholds:
+    protein_count = len(benchmark_proteins)
+    threshold_count = len(distinct_prediction_thresholds)
+    thresholds_array = np.asarray(distinct_prediction_thresholds, dtype=np.float64)
+
+    # Intern every GO term string into a small integer ID once. All the set
+    # membership tests and intersections below then hash machine integers
+    # instead of "GO:XXXXXXX" strings:
+    # (bind the bound method to a local first - these loops run once per term
+    # occurrence, and a local name skips the attribute lookup per iteration)
+    term_to_id = {}
+    intern_term = term_to_id.setdefault
+    for terms in prediction_dict.values():
+        for term in terms:
+            intern_term(term, len(term_to_id))
+    for terms in benchmark_annotations.values():
+        for term in terms:
+            intern_term(term, len(term_to_id))
+
+    prediction_ids = {
+        protein: {term_to_id[term]: score for term, score in terms.items()}
+        for protein, terms in prediction_dict.items()
+    }
+
+    # Convert each protein's benchmark annotation list to a set of IDs once:
+    benchmark_sets = {
+        protein: frozenset(term_to_id[term] for term in terms)
+        for protein, terms in benchmark_annotations.items()
+    }
+    # Pack each protein's benchmark membership into a 64-bit-word bitset over
+    # the term vocabulary. Membership tests against it are a vectorized
+    # shift-and-mask instead of per-term hashing, and the per-protein
+    # annotation counts reduce to a popcount:
+    vocabulary_size = len(term_to_id)
+    word_count = max(1, (vocabulary_size + 63) // 64)
+    benchmark_bitsets = np.zeros((protein_count, word_count), dtype=np.uint64)
+
+    for protein_index, protein in enumerate(benchmark_proteins):
+        benchmark_ids = np.fromiter(
+            benchmark_sets[protein],
+            dtype=np.uint64,
+            count=len(benchmark_sets[protein]),
+        )
+        if benchmark_ids.size:
+            # bitwise_or.at handles several IDs landing in the same word,
+            # which plain fancy-indexed |= would silently drop:
+            np.bitwise_or.at(
+                benchmark_bitsets[protein_index],
+                benchmark_ids >> np.uint64(6),
+                np.uint64(1) << (benchmark_ids & np.uint64(63)),
+            )
 
-    protein_and_threshold_df = initialize_proteins_and_thresholds_dataframe(
-        proteins=benchmark_proteins, thresholds=distinct_prediction_thresholds
+    benchmark_term_counts = (
+        np.unpackbits(benchmark_bitsets.view(np.uint8), axis=1)
+        .sum(axis=1)
+        .astype(np.int32)
     )
 
-    # protein_and_threshold_df has keys (proteins and thresholds), but no values.
-    # Next, populate the DataFrame with the confusion matrix values @ each
-    # decision threshold:
-    for threshold in distinct_prediction_thresholds:
-        for protein in benchmark_proteins:
-
-            predicted_terms = prediction_dict.get(protein, {})
-            # Limit the predictions by the threshold at hand:
-            predicted_annotations = {
-                k for k, v in predicted_terms.items() if v >= threshold
-            }
-            benchmark_protein_annotation = set(benchmark_annotations.get(protein))
-            if len(benchmark_protein_annotation) == 0:
-                # If there are no BENCHMARK annotated terms for the protein of interest,
-                # there is no reason to continue.
-                continue
+    # Information-accretion weights indexed by term ID; terms absent from the
+    # ia table carry zero weight, matching the membership checks the per-term
+    # ia_df lookups used to make:
+    ia_values = np.zeros(len(term_to_id), dtype=np.float64)
+    for term, information_accretion in ia_df["ia"].items():
+        term_id = term_to_id.get(term)
+        if term_id is not None:
+            ia_values[term_id] = information_accretion
+
+    # The benchmark IA sum is threshold-independent, compute it per protein:
+    benchmark_ia_sums = np.fromiter(
+        (
+            ia_values[list(benchmark_sets[protein])].sum()
+            for protein in benchmark_proteins
+        ),
+        dtype=np.float64,
+        count=protein_count,
+    )
 
-            confusion_matrix = calculate_confusion_matrix(
-                predicted_terms=predicted_annotations,
-                benchmark_terms=benchmark_protein_annotation,
-            )
-            protein_and_threshold_df.loc[protein, threshold].tp = confusion_matrix["TP"]
-            protein_and_threshold_df.loc[protein, threshold].fp = confusion_matrix["FP"]
-            protein_and_threshold_df.loc[protein, threshold].fn = confusion_matrix["FN"]
-            true_negative = benchmark_ontology_term_count - sum(
-                confusion_matrix.values()
+    true_positives = np.zeros((protein_count, threshold_count), dtype=np.int32)
+    false_positives = np.zeros_like(true_positives)
+    true_positive_ia = np.zeros((protein_count, threshold_count), dtype=np.float64)
+    predicted_ia = np.zeros_like(true_positive_ia)
+
+    # Proteins are independent, so the sweep is embarrassingly parallel; with
+    # max_workers set, distribute it over a process pool in chunks (each chunk
+    # ships its proteins' predictions plus the shared ia/threshold arrays):
+    predictions_for = prediction_ids.get
+    predicted_terms_per_protein = (
+        predictions_for(protein, {}) for protein in benchmark_proteins
+    )
+    if max_workers is None or max_workers == 1:
+        sweep_results = map(
+            _sweep_protein,
+            predicted_terms_per_protein,
+            benchmark_bitsets,
+            itertools.repeat(ia_values),
+            itertools.repeat(thresholds_array),
+        )
+        sweep_results = list(sweep_results)
+    else:
+        worker_count = max_workers if max_workers > 1 else os.cpu_count()
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=worker_count
+        ) as executor:
+            sweep_results = list(
+                executor.map(
+                    _sweep_protein,
+                    predicted_terms_per_protein,
+                    benchmark_bitsets,
+                    itertools.repeat(ia_values),
+                    itertools.repeat(thresholds_array),
+                    chunksize=max(1, protein_count // (worker_count * 4)),
+                )
             )
-            protein_and_threshold_df.loc[protein, threshold].tn = true_negative
-
-            protein_and_threshold_df.loc[
-                protein, threshold
-            ].precision = confusion_matrix["precision"]
-            protein_and_threshold_df.loc[protein, threshold].recall = confusion_matrix[
-                "recall"
-            ]
-
-            ia_sums = calculate_weighted_confusion_matrix(
-                predicted_terms=predicted_annotations,
-                benchmark_terms=benchmark_protein_annotation,
-                ia_df=ia_df,
+
+    for protein_index, sweep_result in enumerate(sweep_results):
+        if sweep_result is None:
+            # the protein has no predictions at all:
+            continue
+        accepted, protein_tp, protein_tp_ia, protein_predicted_ia = sweep_result
+        true_positives[protein_index, :] = protein_tp
+        false_positives[protein_index, :] = accepted - protein_tp
+        true_positive_ia[protein_index, :] = protein_tp_ia
+        predicted_ia[protein_index, :] = protein_predicted_ia
+
+    # Counts are bounded by the ontology term vocabulary (tens of thousands),
+    # so the four confusion-matrix columns are kept in int32 throughout
+    # rather than pandas' int64/float64 defaults - half the memory traffic on
+    # what is a memory-bound workload. The subtraction is pinned explicitly so
+    # scalar type promotion can never widen it:
+    false_negatives = benchmark_term_counts[:, None] - true_positives
+    true_negatives = (
+        benchmark_ontology_term_count
+        - true_positives
+        - false_positives
+        - false_negatives
+    ).astype(np.int32, copy=False)
+
+    false_positive_ia = predicted_ia - true_positive_ia
+    false_negative_ia = benchmark_ia_sums[:, None] - true_positive_ia
+
+    # If there are no BENCHMARK annotated terms for a protein, leave its rows
+    # all-zero (previously handled with a per-protein `continue`):
+    empty_benchmark_mask = benchmark_term_counts == 0
+    if empty_benchmark_mask.any():
+        false_positives[empty_benchmark_mask, :] = 0
+        true_negatives[empty_benchmark_mask, :] = 0
+        false_positive_ia[empty_benchmark_mask, :] = 0.0
+        predicted_ia[empty_benchmark_mask, :] = 0.0
+
+    predicted_counts = true_positives + false_positives
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(
+            predicted_counts > 0, true_positives / predicted_counts, 0.0
+        )
+        recall = np.where(
+            benchmark_term_counts[:, None] > 0,
+            true_positives / benchmark_term_counts[:, None],
+            0.0,
+        )
+        weighted_precision = np.where(
+            predicted_ia > 0, true_positive_ia / predicted_ia, 0.0
+        )
+        weighted_recall = np.where(
+            benchmark_ia_sums[:, None] > 0,
+            true_positive_ia / benchmark_ia_sums[:, None],
+            0.0,
+        )
+
+    # Pack everything into one contiguous structured array, row order
+    # protein-major (row = protein_index * threshold_count + threshold_index).
+    # Only the thresholds that actually exist in the prediction data get rows,
+    # not a complete range of possible thresholds:
+    # default guards the empty-benchmark case, which should yield zero
+    # records rather than a max() ValueError:
+    protein_name_length = max(
+        (len(protein) for protein in benchmark_proteins), default=1
+    )
+    record_dtype = np.dtype(
+        [("protein", f"U{protein_name_length}"), ("threshold", np.float64)]
+        + [
+            (field, np.float64)
+            for field in (
+                "tp_ia",
+                "fp_ia",
+                "fn_ia",
+                "benchmark_ia",
+                "ru",
+                "mi",
+                "weighted_precision",
+                "weighted_recall",
             )
-            protein_and_threshold_df.loc[protein, threshold].tp_ia = ia_sums["TP"]
-            protein_and_threshold_df.loc[protein, threshold].fp_ia = ia_sums["FP"]
-            protein_and_threshold_df.loc[protein, threshold].fn_ia = ia_sums["FN"]
-            protein_and_threshold_df.loc[protein, threshold].ru = ia_sums["ru"]
-            protein_and_threshold_df.loc[protein, threshold].mi = ia_sums["mi"]
-            protein_and_threshold_df.loc[protein, threshold].benchmark_ia = ia_sums[
-                "benchmark_ia"
-            ]
-            protein_and_threshold_df.loc[
-                protein, threshold
-            ].weighted_precision = ia_sums["weighted_precision"]
-            protein_and_threshold_df.loc[
-                protein, threshold
-            ].weighted_recall = ia_sums["weighted_recall"]
-
-    # Lastly, add some metadata to each row:
-    protein_and_threshold_df.insert(0, "taxon", benchmark_taxon)
-    protein_and_threshold_df.insert(0, "taxon_id", benchmark_taxon_id)
-    protein_and_threshold_df.insert(0, "ontology", benchmark_ontology)
+        ]
+        + [(field, np.int32) for field in ("tp", "fp", "fn", "tn")]
+        + [("precision", np.float64), ("recall", np.float64)]
+    )
+    records = np.zeros(protein_count * threshold_count, dtype=record_dtype)
+    records["protein"] = np.repeat(benchmark_proteins, threshold_count)
+    records["threshold"] = np.tile(thresholds_array, protein_count)
+    # Terms missing from the ia table carry zero weight, so ru (the IA of
+    # benchmark terms NOT predicted) is exactly fn_ia, and mi (the IA of
+    # predicted terms NOT in the benchmark) is exactly fp_ia:
+    records["tp_ia"] = true_positive_ia.reshape(-1)
+    records["fp_ia"] = false_positive_ia.reshape(-1)
+    records["fn_ia"] = false_negative_ia.reshape(-1)
+    records["benchmark_ia"] = np.repeat(benchmark_ia_sums, threshold_count)
+    records["ru"] = false_negative_ia.reshape(-1)
+    records["mi"] = false_positive_ia.reshape(-1)
+    records["weighted_precision"] = weighted_precision.reshape(-1)
+    records["weighted_recall"] = weighted_recall.reshape(-1)
+    records["tp"] = true_positives.reshape(-1)
+    records["fp"] = false_positives.reshape(-1)
+    records["fn"] = false_negatives.reshape(-1)
+    records["tn"] = true_negatives.reshape(-1)
+    records["precision"] = precision.reshape(-1)
+    records["recall"] = recall.reshape(-1)
+
+    return records
+
+
+def get_confusion_matrix_dataframe(
+    prediction_dict: dict,
+    benchmark_dict: dict,
+    ia_df: pd.DataFrame,
+    max_workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """Wraps get_confusion_matrix_records in a pandas.DataFrame indexed by
+    (protein, threshold), with the benchmark metadata scalars (ontology,
+    taxon_id, taxon) broadcast across the rows. See
+    get_confusion_matrix_records for the input formats and the max_workers
+    semantics.
+    """
+    records = get_confusion_matrix_records(
+        prediction_dict=prediction_dict,
+        benchmark_dict=benchmark_dict,
+        ia_df=ia_df,
+        max_workers=max_workers,
+    )
+
+    index = pd.MultiIndex.from_arrays(
+        [records["protein"].astype(object), records["threshold"]],
+        names=["protein", "threshold"],
+    )
+    # The per-row metadata scalars broadcast for free here; adding them after
+    # the fact with df.insert would reshuffle and copy the whole frame once
+    # per column:
+    data = {
+        "ontology": benchmark_dict.get("benchmark_ontology"),
+        "taxon_id": benchmark_dict.get("benchmark_taxon_id"),
+        "taxon": benchmark_dict.get("benchmark_taxon"),
+    }
+    # each metric column is a zero-copy view into the structured array:
+    data.update(
+        (field, records[field])
+        for field in records.dtype.names
+        if field not in ("protein", "threshold")
+    )
+    protein_and_threshold_df = pd.DataFrame(data, index=index)
 
     """ The final DataFrame has this form:
     +------------------------+------------+------------+---------+------+------+------+------+
@@ -319,18 +535,22 @@ def get_confusion_matrix_dataframe(
 
 
 def evaluate_species(
-    prediction_filepath_str: str, benchmark_filepath_str: str, ia_df: pd.DataFrame
+    prediction_filepath_str: str,
+    benchmark_filepath_str: str,
+    ia_df: pd.DataFrame,
+    max_workers: Optional[int] = None,
 ) -> pd.DataFrame:
 
 
-    with open(prediction_filepath_str, "r") as prediction_handle:
-        predictions = json.load(prediction_handle)
-
-    with open(benchmark_filepath_str, "r") as benchmark_handle:
-        benchmark = json.load(benchmark_handle)
+    predictions = _load_prediction_json(Path(prediction_filepath_str))
+    # The benchmark files are comparatively small, always parse them in full:
+    benchmark = _load_json(Path(benchmark_filepath_str))
 
     metrics_df = get_confusion_matrix_dataframe(
-        prediction_dict=predictions, benchmark_dict=benchmark, ia_df=ia_df
+        prediction_dict=predictions,
+        benchmark_dict=benchmark,
+        ia_df=ia_df,
+        max_workers=max_workers,
     )
     return metrics_df
 
@@ -341,6 +561,7 @@ def main(
     ia_parent_directory: str,
     model_id: int,
     ontologies: Iterable = ("CCO", "BPO"),
+    max_workers: Optional[int] = None,
 ):
     """A generator function which yields pandas DataFrames. Each DataFrame contains evaluation metrics
     for a specific species + ontology pairing.
@@ -409,7 +630,9 @@ def main(
                 print(f"\t NO PREDICTION FILE FOUND FOR {benchmark_file} {taxon_str}/{taxon_id} WITH ONTOLOGY {ontology}")
                 continue
 
-            yield evaluate_species(prediction_file, benchmark_file, ia_df)
+            yield evaluate_species(
+                prediction_file, benchmark_file, ia_df, max_workers=max_workers
+            )
 
 
 if __name__ == "__main__":
@@ -431,12 +654,20 @@ if __name__ == "__main__":
 
         dataframe_write_directory = config.get("predictions_dataframes_directory")
 
+        # optional worker count for the per-protein sweep (see
+        # get_confusion_matrix_dataframe); absent means serial:
+        worker_count = config.get("worker_count")
+        # explicit None check: a configured 0 means one worker per CPU core,
+        # only an absent key runs serially:
+        worker_count = int(worker_count) if worker_count is not None else None
+
         for taxon_result_df in main(
             prediction_filepath_str,
             benchmark_filepath_str,
             dag_directory_filepath_str,
             model_id,
             ontologies,
+            max_workers=worker_count,
         ):
             print(taxon_result_df.iloc[:10, :].to_markdown(tablefmt="grid"))
             row_count, col_count = taxon_result_df.shape
@@ -144,25 +144,38 @@ def get_annotation_dataframe(
     T100900000453           0           0           0           0           0
     """
     proteins = sorted(list({protein for protein, _ in annotation_pairs}))
+    columns = sorted(list(dag.keys()))
 
-    annotation_df = pd.DataFrame(
-        data=0, index=proteins, columns=sorted(list(dag.keys()))
-    )
     propagation_map = pd.read_pickle(propagation_map_filepath)
     # propagation_map = pd.read_pickle("./cco_propagation_map.pkl")
 
-    # loop the leaf-only groundtruth, updating the dataframe with propagated
+    # Work against a plain NumPy matrix and integer index maps inside the
+    # loop; per-pair .loc lookups and label-based assignments pay full indexer
+    # dispatch on every iteration:
+    annotation_matrix = np.zeros((len(proteins), len(columns)), dtype=int)
+    protein_indices = {protein: i for i, protein in enumerate(proteins)}
+    column_indices = {column: i for i, column in enumerate(columns)}
+    propagation_values = propagation_map.to_numpy()
+    propagation_rows = {node: i for i, node in enumerate(propagation_map.index)}
+    # map the propagation-map columns onto the annotation matrix columns once:
+    propagation_column_targets = np.asarray(
+        [column_indices.get(column, -1) for column in propagation_map.columns]
+    )
+
+    # loop the leaf-only groundtruth, updating the matrix with propagated
     # annotations (toggle zero vals to 1 where appropriate):
     for protein, node in annotation_pairs:
         # TODO: Consider alt-IDs
-        try:
-            propagation_df_row = propagation_map.loc[node, :]
-            propagation_mask = propagation_df_row == 1
-            # column names (GO IDs) that are ancestors of our leaf GO ID:
-            propagation_mask_cols = propagation_mask.index[propagation_mask].tolist()
-            annotation_df.loc[protein, propagation_mask_cols] = 1
-        except KeyError:
-            pass
+        propagation_row = propagation_rows.get(node)
+        if propagation_row is None:
+            continue
+        # column indices (GO IDs) that are ancestors of our leaf GO ID:
+        targets = propagation_column_targets[
+            propagation_values[propagation_row] == 1
+        ]
+        annotation_matrix[protein_indices[protein], targets[targets >= 0]] = 1
+
+    annotation_df = pd.DataFrame(annotation_matrix, index=proteins, columns=columns)
 
     if pare_df:
         # TODO: For the sake of expediency, temporarily pare the terms down to those
@@ -193,25 +206,35 @@ def propagate_annotation_dataframe(
     T100900000453           0           0           0           0           0
     """
     proteins = sorted(list({protein for protein, _ in annotation_pairs}))
+    columns = sorted(list(dag.keys()))
 
-    annotation_df = pd.DataFrame(
-        data=0, index=proteins, columns=sorted(list(dag.keys()))
-    )
     propagation_map = pd.read_pickle(propagation_map_filepath)
     # propagation_map = pd.read_pickle("./cco_propagation_map.pkl")
 
-    # loop the leaf-only groundtruth, updating the dataframe with propagated
+    # As in get_annotation_dataframe, fill a plain NumPy matrix through
+    # integer index maps instead of per-pair .loc label assignments:
+    annotation_matrix = np.zeros((len(proteins), len(columns)), dtype=int)
+    protein_indices = {protein: i for i, protein in enumerate(proteins)}
+    column_indices = {column: i for i, column in enumerate(columns)}
+    propagation_values = propagation_map.to_numpy()
+    propagation_rows = {node: i for i, node in enumerate(propagation_map.index)}
+    propagation_column_targets = np.asarray(
+        [column_indices.get(column, -1) for column in propagation_map.columns]
+    )
+
+    # loop the leaf-only groundtruth, updating the matrix with propagated
     # annotations (toggle zero vals to 1 where appropriate):
     for protein, node in annotation_pairs:
         # TODO: Consider alt-IDs
-        try:
-            propagation_df_row = propagation_map.loc[node, :]
-            propagation_mask = propagation_df_row == 1
-            # column names (GO IDs) that are ancestors of our leaf GO ID:
-            propagation_mask_cols = propagation_mask.index[propagation_mask].tolist()
-            annotation_df.loc[protein, propagation_mask_cols] = 1
-        except KeyError:
-            pass
+        propagation_row = propagation_rows.get(node)
+        if propagation_row is None:
+            continue
+        targets = propagation_column_targets[
+            propagation_values[propagation_row] == 1
+        ]
+        annotation_matrix[protein_indices[protein], targets[targets >= 0]] = 1
+
+    annotation_df = pd.DataFrame(annotation_matrix, index=proteins, columns=columns)
 
     if pare_df:
         # TODO: For the sake of expediency, temporarily pare the terms down to those
@@ -261,10 +284,14 @@ def get_prediction_coverage(prediction: pd.DataFrame, benchmark: pd.DataFrame) -
     """
     benchmark_protein_count = benchmark.shape[0]
     # count proteins from the benchmark that also exist in the prediction and have
-    # at least one non-zero prediction value:
+    # at least one non-zero prediction value. Reduce the prediction matrix to a
+    # per-protein "any non-zero" flag once instead of a .loc row scan per protein:
+    has_nonzero_prediction = dict(
+        zip(prediction.index, (prediction.to_numpy() > 0).any(axis=1))
+    )
     coverage_proteins = [
         protein
         for protein in benchmark.index
-        if protein in prediction.index and any(prediction.loc[protein, :] > 0)
+        if has_nonzero_prediction.get(protein, False)
     ]
     return len(coverage_proteins) / benchmark_protein_count